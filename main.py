@@ -1,11 +1,16 @@
 import os
 import os.path
+import bisect
+import heapq
 import json
 import logging
+import pickle
 import pathlib
+import shutil
 import sqlite3
 import urllib
 import subprocess
+from dataclasses import dataclass
 
 from ulauncher.api.client.Extension import Extension
 from ulauncher.api.client.EventListener import EventListener
@@ -19,19 +24,303 @@ from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
 from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
 from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
 from ulauncher.api.shared.action.ExtensionCustomAction import ExtensionCustomAction
-import re
 import time
 
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
 logger = logging.getLogger(__name__)
 
+# Character classes used by command_score to detect word boundaries
+_GAP_CHARS = frozenset('\\/_+.#"@[({&')
+_SPACE_CHARS = frozenset(" \t\n\r-")
+
+if np is not None:
+    _SPACE_BYTES = np.frombuffer(b" \t\n\r-", dtype=np.uint8)
+    _GAP_BYTES = np.frombuffer(b'\\/_+.#"@[({&', dtype=np.uint8)
+
+
+def _encode_latin1(string):
+    """Encode a string as a uint8 array, or None if it is not latin-1."""
+    try:
+        return np.frombuffer(string.encode("latin-1"), dtype=np.uint8)
+    except UnicodeEncodeError:
+        return None
+
+
+def _boundary_bonus_array(lower_bytes):
+    """Vectorized per-character jump multiplier over latin-1 bytes."""
+    is_space = np.isin(lower_bytes, _SPACE_BYTES)
+    is_gap = np.isin(lower_bytes, _GAP_BYTES)
+    return np.where(is_space, 0.9, np.where(is_gap, 0.8, 0.17))
+
+
+def _boundary_bonus(lower_string):
+    """
+    Per-character jump multiplier for command_score: 0.9 for a space-like
+    character, 0.8 for a gap character, 0.17 otherwise. A jump landing at
+    index i is scored by the class of the character at i - 1.
+
+    Uses one vectorized NumPy pass when available (and the string is
+    latin-1 encodable); falls back to a plain comprehension otherwise.
+    """
+    if np is not None:
+        arr = _encode_latin1(lower_string)
+        if arr is not None:
+            # Stay in float64 so scores match the fallback path exactly;
+            # tolist() gives plain floats, which index faster in the DP loop
+            return _boundary_bonus_array(arr).tolist()
+    return [
+        0.9 if ch in _SPACE_CHARS else 0.8 if ch in _GAP_CHARS else 0.17
+        for ch in lower_string
+    ]
+
+
+def _char_mask(string):
+    """64-bit bitset fingerprint of a string's (lowercased) characters."""
+    mask = 0
+    for byte in string.encode("utf-8"):
+        mask |= 1 << (byte & 63)
+    return mask
+
+
+def _char_positions(string):
+    """Map each character to the sorted list of its indices in string."""
+    positions = {}
+    for index, char in enumerate(string):
+        positions.setdefault(char, []).append(index)
+    return positions
+
+
+def _is_subsequence(query_lower, char_positions):
+    """
+    True if the characters of query_lower appear in order in the string
+    whose _char_positions index is given. Each step jumps straight to the
+    next occurrence with a bisect instead of rescanning the string.
+    """
+    start = 0
+    for char in query_lower:
+        positions = char_positions.get(char)
+        if positions is None:
+            return False
+        i = bisect.bisect_left(positions, start)
+        if i == len(positions):
+            return False
+        start = positions[i] + 1
+    return True
+
+
+def _prepare_abbreviation(abbreviation):
+    """
+    Encode the query once per keystroke for the compiled kernel, returning
+    (lowercased bytes, original bytes, needs-case-check) or None when the
+    kernel cannot be used for it (no NumPy, or the query is not latin-1).
+    """
+    if np is None:
+        return None
+    lower = abbreviation.lower()
+    lower_bytes = _encode_latin1(lower)
+    abbr_bytes = _encode_latin1(abbreviation)
+    if lower_bytes is None or abbr_bytes is None:
+        return None
+    if lower_bytes.shape[0] != abbr_bytes.shape[0]:
+        return None
+    return lower_bytes, abbr_bytes, abbreviation != lower
+
+
+if np is not None and njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def _score_kernel(
+        lower_bytes,
+        full_bytes,
+        abbr_lower_bytes,
+        abbr_bytes,
+        boundary,
+        string_len,
+        check_case,
+    ):
+        # Compiled twin of the pure-Python DP in command_score; see there
+        # for the algorithm commentary.
+        str_len = lower_bytes.shape[0]
+        prev = np.full(str_len + 1, 0.99)
+        prev[string_len] = 1.0
+        curr = np.zeros(str_len + 1)
+
+        for abbr_index in range(abbr_lower_bytes.shape[0] - 1, -1, -1):
+            abbr_char = abbr_lower_bytes[abbr_index]
+            abbr_orig = abbr_bytes[abbr_index]
+            bmax = 0.0
+            cmax = 0.0
+            cplain = 0.0
+            curr[str_len] = 0.0
+
+            for index in range(str_len - 1, -1, -1):
+                cmax *= 0.999
+                base = 0.0
+                if lower_bytes[index] == abbr_char:
+                    base = prev[index + 1]
+                    if check_case and full_bytes[index] != abbr_orig:
+                        base *= 0.9999
+                    if index > 0:
+                        bonus = boundary[index - 1]
+                        if bonus != 0.17:
+                            boundary_score = base * bonus
+                            if boundary_score > bmax:
+                                bmax = boundary_score
+                        else:
+                            jump = base * 0.17
+                            if jump > cmax:
+                                cmax = jump
+                            if jump > cplain:
+                                cplain = jump
+
+                best = base
+                if bmax > best:
+                    best = bmax
+                if index > 0:
+                    if cmax > best:
+                        best = cmax
+                elif cplain > best:
+                    best = cplain
+                curr[index] = best
+
+            prev, curr = curr, prev
+
+        return prev[0]
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _score_batch_kernel(
+        lower_cat,
+        full_cat,
+        offsets,
+        boundary,
+        case_flags,
+        abbr_lower_bytes,
+        abbr_bytes,
+        abbr_has_case,
+    ):
+        # Score every segment (two per recent: label then URI) against the
+        # query in one call, parallelized across candidates
+        count = offsets.shape[0] - 1
+        scores = np.empty(count)
+        for i in prange(count):
+            start = offsets[i]
+            end = offsets[i + 1]
+            # Each segment is the original string plus the separator, so
+            # the original length is the segment length minus one
+            scores[i] = _score_kernel(
+                lower_cat[start:end],
+                full_cat[start:end],
+                abbr_lower_bytes,
+                abbr_bytes,
+                boundary[start:end],
+                end - start - 1,
+                abbr_has_case or case_flags[i] != 0,
+            )
+        return scores
+
+else:
+    _score_kernel = None
+    _score_batch_kernel = None
+
+
+def _build_recents_soa(recents):
+    """
+    Pack all candidate strings into concatenated byte and boundary-bonus
+    arrays (two segments per recent: label then URI) for the batch kernel.
+    Returns None when NumPy is unavailable, the list is empty, or any
+    string is not latin-1 (the per-candidate path handles those).
+    """
+    if np is None or not recents:
+        return None
+    segments_lower = []
+    segments_full = []
+    offsets = [0]
+    case_flags = []
+    total = 0
+    for recent in recents:
+        for full_string, lower_string in (
+            (recent.label + " ", recent.label_lower),
+            (recent.uri + " ", recent.uri_lower),
+        ):
+            lower_bytes = _encode_latin1(lower_string)
+            full_bytes = _encode_latin1(full_string)
+            if (
+                lower_bytes is None
+                or full_bytes is None
+                or lower_bytes.shape[0] != full_bytes.shape[0]
+            ):
+                return None
+            segments_lower.append(lower_bytes)
+            segments_full.append(full_bytes)
+            # Whether this segment can trigger the case-mismatch penalty
+            case_flags.append(1 if full_string != lower_string else 0)
+            total += lower_bytes.shape[0]
+            offsets.append(total)
+    lower_cat = np.concatenate(segments_lower)
+    return (
+        lower_cat,
+        np.concatenate(segments_full),
+        np.asarray(offsets, dtype=np.int64),
+        _boundary_bonus_array(lower_cat),
+        np.asarray(case_flags, dtype=np.uint8),
+    )
+
 
 # Command score function
-def command_score(string, abbreviation, aliases=None):
+def command_score(
+    string, abbreviation, aliases=None, prepared_abbreviation=None, lower_string=None
+):
     if aliases is None:
         aliases = []
 
+    # Callers that score many candidates against one query can pass the
+    # result of _prepare_abbreviation once instead of re-encoding it per
+    # call, and the candidate's lowercased form (with the trailing alias
+    # separator) instead of re-lowercasing it per keystroke.
+    full_string = string + " " + " ".join(aliases)
+    if lower_string is None:
+        lower_string = full_string.lower()
+
+    # Hand the whole DP to the compiled kernel when possible
+    if _score_kernel is not None:
+        if prepared_abbreviation is None:
+            prepared_abbreviation = _prepare_abbreviation(abbreviation)
+        if prepared_abbreviation is not None:
+            lower_bytes = _encode_latin1(lower_string)
+            full_bytes = _encode_latin1(full_string)
+            if (
+                lower_bytes is not None
+                and full_bytes is not None
+                and lower_bytes.shape[0] == full_bytes.shape[0]
+            ):
+                return float(
+                    _score_kernel(
+                        lower_bytes,
+                        full_bytes,
+                        prepared_abbreviation[0],
+                        prepared_abbreviation[1],
+                        _boundary_bonus_array(lower_bytes),
+                        len(string),
+                        prepared_abbreviation[2] or full_string != lower_string,
+                    )
+                )
+
     # Score constants
-    SCORE_CONTINUE_MATCH = 1
+    SCORE_CONTINUE_MATCH = 1.0
     SCORE_SPACE_WORD_JUMP = 0.9
     SCORE_NON_SPACE_WORD_JUMP = 0.8
     SCORE_CHARACTER_JUMP = 0.17
@@ -39,68 +328,100 @@ def command_score(string, abbreviation, aliases=None):
     PENALTY_SKIPPED = 0.999
     PENALTY_CASE_MISMATCH = 0.9999
 
-    # Regular expressions for matching gaps and spaces
-    IS_GAP_REGEXP = re.compile(r'[\\\/_+.#"@\[\(\{&]')
-    IS_SPACE_REGEXP = re.compile(r"[\s-]")
-
-    # Convert string and aliases to lowercase
-    lower_string = (string + " " + " ".join(aliases)).lower()
     lower_abbreviation = abbreviation.lower()
 
-    # Recursive function to calculate score
-    def score(string_index, abbr_index, memo=None):
-        if memo is None:
-            memo = {}
-
-        # Memoization key
-        memo_key = (string_index, abbr_index)
-        if memo_key in memo:
-            return memo[memo_key]
-
-        # Base case: if we have matched all abbreviation characters
-        if abbr_index == len(abbreviation):
-            return SCORE_CONTINUE_MATCH if string_index == len(string) else 0.99
-
-        # Find the next matching character in the string
-        abbreviation_char = lower_abbreviation[abbr_index]
-        high_score = 0
-        index = lower_string.find(abbreviation_char, string_index)
-
-        # Loop through possible matches
-        while index != -1:
-            temp_score = score(index + 1, abbr_index + 1, memo)
-
-            # Continuous match
-            if index == string_index:
-                temp_score *= SCORE_CONTINUE_MATCH
-            # Word boundary match
-            elif IS_SPACE_REGEXP.match(lower_string[index - 1]):
-                temp_score *= SCORE_SPACE_WORD_JUMP
-            elif IS_GAP_REGEXP.match(lower_string[index - 1]):
-                temp_score *= SCORE_NON_SPACE_WORD_JUMP
-            # Character jump
-            else:
-                temp_score *= SCORE_CHARACTER_JUMP
-                if string_index > 0:
-                    temp_score *= PENALTY_SKIPPED ** (index - string_index)
-
-            # Case mismatch penalty
-            if string[index] != abbreviation[abbr_index]:
-                temp_score *= PENALTY_CASE_MISMATCH
-
-            # Update the best score
-            if temp_score > high_score:
-                high_score = temp_score
-
-            # Look for the next match in the string
-            index = lower_string.find(abbreviation_char, index + 1)
-
-        # Memoize the result
-        memo[memo_key] = high_score
-        return high_score
+    str_len = len(lower_string)
+    string_len = len(string)
+
+    # The case-mismatch penalty can only ever fire when one side actually
+    # contains uppercase; all-lowercase query against an all-lowercase
+    # candidate (the common case) skips the per-match compare entirely
+    check_case = full_string != lower_string or abbreviation != lower_abbreviation
+
+    # One vectorized classification pass replaces the per-cell set lookups
+    boundary = _boundary_bonus(lower_string)
+
+    # Bottom-up DP over two rolling rows. prev[i] holds the best score for
+    # matching the remaining abbreviation (one char further in) starting the
+    # search at string index i; curr is the row being filled. The base row is
+    # the old recursion's base case: a fully consumed string scores 1.0, a
+    # partial match 0.99.
+    prev = [0.99] * (str_len + 1)
+    prev[string_len] = SCORE_CONTINUE_MATCH
+
+    for abbr_index in range(len(abbreviation) - 1, -1, -1):
+        abbr_char = lower_abbreviation[abbr_index]
+        abbr_orig = abbreviation[abbr_index]
+        curr = [0.0] * (str_len + 1)
+
+        # Running maxima over match positions at or beyond the current index:
+        # bmax covers word-boundary jumps, cmax covers character jumps and is
+        # decayed by PENALTY_SKIPPED per skipped character, cplain is the
+        # undecayed variant used at index 0 (where no skip penalty applies).
+        bmax = 0.0
+        cmax = 0.0
+        cplain = 0.0
+
+        for index in range(str_len - 1, -1, -1):
+            cmax *= PENALTY_SKIPPED
+            base = 0.0
+            if lower_string[index] == abbr_char:
+                base = prev[index + 1]
+                # Case mismatch penalty
+                if check_case and full_string[index] != abbr_orig:
+                    base *= PENALTY_CASE_MISMATCH
+                # Classify how a jump would land on this position
+                if index > 0:
+                    bonus = boundary[index - 1]
+                    if bonus != SCORE_CHARACTER_JUMP:
+                        boundary_score = base * bonus
+                        if boundary_score > bmax:
+                            bmax = boundary_score
+                    else:
+                        jump = base * SCORE_CHARACTER_JUMP
+                        if jump > cmax:
+                            cmax = jump
+                        if jump > cplain:
+                            cplain = jump
+
+            # Best of: continuous match here, boundary jump ahead, char jump
+            # ahead (penalty-free when starting from index 0)
+            best = base * SCORE_CONTINUE_MATCH
+            if bmax > best:
+                best = bmax
+            if index > 0:
+                if cmax > best:
+                    best = cmax
+            elif cplain > best:
+                best = cplain
+            curr[index] = best
+
+        prev = curr
 
     # Start the scoring from the first character
-    return score(0, 0)
+    return prev[0]
+
+
+@dataclass(slots=True)
+class Recent:
+    """
+    One recently-opened entry plus everything the per-keystroke hot path
+    needs precomputed. Slot attribute access beats dict lookups in the
+    scoring loop, and the records are picklable for the sidecar cache.
+    """
+
+    uri: str
+    label: str
+    icon: str
+    option: str
+    type: str
+    label_lower: str
+    uri_lower: str
+    mask: int
+    label_positions: dict
+    uri_positions: dict
+    display_label: str
+    display_uri: str
 
 
 class Utils:
@@ -115,13 +436,17 @@ class Utils:
 
 
 class Code:
-    path_dirs = ("/usr/bin", "/bin", "/snap/bin")
-    variants = ("Code", "Codium")
+    # Supported variants: command name on $PATH -> config directory name
+    variants = (("code", "Code"), ("codium", "VSCodium"))
 
-    # Cache for recent entries and cache expiry
+    # Defaults for the per-instance recents cache. Freshness comes from the
+    # source mtime check on every lookup; the TTL only bounds how long the
+    # fast path can bypass the sidecar/parse machinery
     _cached_recents = None
+    _cached_signature = None
     _cache_timestamp = 0
-    _cache_duration = 60  # Cache duration in seconds
+    _cache_duration = 600  # Cache duration in seconds
+    _cache_schema = 4  # Bump when the precomputed recent fields change
 
     def __init__(self):
         self.installed_path = None
@@ -130,59 +455,118 @@ class Code:
         self.storage_json = None
         self.include_types = None
         self.prefer_type = None
+        self._sidecar_db = self._open_sidecar_cache()
+        self._base_env = os.environ.copy()
+        # In-memory parse results keyed by (source, include_types) -> (mtime,
+        # recents); serves repeat lookups with just a stat call
+        self._parsed_by_mtime = {}
 
         logger.debug("locating installation and config directories")
-        for path in (pathlib.Path(path_dir) for path_dir in Code.path_dirs):
-            for variant in Code.variants:
-                installed_path = path / variant.lower()
-                if not installed_path.exists():
-                    continue
-                if variant == "Codium":
-                    variant_config = "VSCodium"
-                else:
-                    variant_config = variant
-                config_path = pathlib.Path.home() / ".config" / variant_config
+        for command, variant_config in Code.variants:
+            # which() honours $PATH, so non-standard install locations work
+            installed_path = shutil.which(command)
+            if not installed_path:
+                continue
+            config_path = pathlib.Path.home() / ".config" / variant_config
+            logger.debug(
+                "evaluating installation %s and config dir %s",
+                installed_path,
+                config_path,
+            )
+            if (config_path / "User" / "globalStorage" / "storage.json").exists():
                 logger.debug(
-                    "evaluating installation dir %s and config dir %s",
+                    "found installation %s and config dir %s",
                     installed_path,
                     config_path,
                 )
-                if (
-                    installed_path.exists()
-                    and config_path.exists()
-                    and (
-                        config_path / "User" / "globalStorage" / "storage.json"
-                    ).exists()
-                ):
-                    logger.debug(
-                        "found installation dir %s and config dir %s",
-                        installed_path,
-                        config_path,
-                    )
-                    self.installed_path = installed_path
-                    self.config_path = config_path
-                    self.global_state_db = (
-                        config_path / "User" / "globalStorage" / "state.vscdb"
-                    )
-                    self.storage_json = (
-                        config_path / "User" / "globalStorage" / "storage.json"
-                    )
-                    return
+                self.installed_path = installed_path
+                self.config_path = config_path
+                self.global_state_db = (
+                    config_path / "User" / "globalStorage" / "state.vscdb"
+                )
+                self.storage_json = (
+                    config_path / "User" / "globalStorage" / "storage.json"
+                )
+                return
 
         logger.warning("Unable to find VS Code installation and config directory")
 
     def is_installed(self):
         return bool(self.installed_path)
 
+    @staticmethod
+    def _open_sidecar_cache():
+        """
+        Open (creating if needed) the persistent cache of parsed recents,
+        keyed by the source file's mtime so a restart of the extension does
+        not have to reparse an unchanged VS Code state database.
+        """
+        cache_dir = pathlib.Path.home() / ".cache" / "ulauncher-vscode-recent"
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(cache_dir / "cache.db"), check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS kv "
+                "(key TEXT PRIMARY KEY, mtime REAL, blob BLOB)"
+            )
+            db.commit()
+            return db
+        except (OSError, sqlite3.Error):
+            logger.debug("sidecar cache unavailable", exc_info=True)
+            return None
+
+    def _sidecar_get(self, key, mtime):
+        if self._sidecar_db is None:
+            return None
+        try:
+            row = self._sidecar_db.execute(
+                "SELECT blob FROM kv WHERE key = ? AND mtime = ?", (key, mtime)
+            ).fetchone()
+            if row is not None:
+                return pickle.loads(row[0])
+        except (sqlite3.Error, pickle.PickleError, AttributeError):
+            logger.debug("sidecar cache read failed", exc_info=True)
+        return None
+
+    def _sidecar_put(self, key, mtime, value):
+        if self._sidecar_db is None:
+            return
+        try:
+            self._sidecar_db.execute(
+                "INSERT OR REPLACE INTO kv (key, mtime, blob) VALUES (?, ?, ?)",
+                (key, mtime, pickle.dumps(value)),
+            )
+            self._sidecar_db.commit()
+        except (sqlite3.Error, pickle.PickleError):
+            logger.debug("sidecar cache write failed", exc_info=True)
+
+    def invalidate_recents_cache(self):
+        """Drop the TTL cache, e.g. after a preference change refilters it."""
+        self._cached_recents = None
+
+    def _source_signature(self):
+        """mtimes of the recents sources; None stands in for a missing file."""
+        signature = []
+        for path in (self.global_state_db, self.storage_json):
+            try:
+                signature.append(os.stat(path).st_mtime)
+            except (OSError, TypeError):
+                signature.append(None)
+        return tuple(signature)
+
     def get_recents(self):
-        # Check if we have valid cached recents
+        # Serve the cached recents only while the sources are unchanged, so
+        # a write by VS Code is picked up on the next lookup rather than
+        # after TTL expiry
         current_time = time.time()
+        signature = self._source_signature()
         if (
-            Code._cached_recents
-            and current_time - Code._cache_timestamp < Code._cache_duration
+            self._cached_recents
+            and current_time - self._cache_timestamp < Code._cache_duration
+            and signature == self._cached_signature
         ):
             logger.debug("Returning cached recents")
-            return Code._cached_recents
+            return self._cached_recents
 
         # Fetch recents from global state or legacy storage if cache is expired
         recents = []
@@ -190,34 +574,86 @@ class Code:
         include_types = self.include_types
         prefer_type = self.prefer_type
 
+        # The parsed result depends on include_types, so it is part of the
+        # sidecar cache key alongside the source file's mtime; the schema
+        # version invalidates pickles whose precomputed fields are outdated
+        cache_key = "%d:%s" % (
+            Code._cache_schema,
+            ",".join(include_types) if include_types else "",
+        )
+
         if self.global_state_db.exists():
-            logger.debug("getting recents from global state database")
-            try:
-                recents = self.get_recents_global_state()
-            except Exception as e:
-                logger.error("getting recents from global state database failed", e)
-                if not self.storage_json.exists():
-                    raise e
+            mtime = os.stat(self.global_state_db).st_mtime
+            mem_key = ("global", cache_key)
+            cached = self._parsed_by_mtime.get(mem_key)
+            if cached is not None and cached[0] == mtime:
+                logger.debug("returning memory-cached recents for global state")
+                recents = cached[1]
+            else:
+                cached = self._sidecar_get("global:" + cache_key, mtime)
+                if cached is not None:
+                    logger.debug("returning sidecar-cached recents for global state")
+                    recents = cached
+                else:
+                    logger.debug("getting recents from global state database")
+                    try:
+                        recents = self.get_recents_global_state()
+                        self._sidecar_put("global:" + cache_key, mtime, recents)
+                    except Exception as e:
+                        logger.error(
+                            "getting recents from global state database failed", e
+                        )
+                        if not self.storage_json.exists():
+                            raise e
+                # One entry per source key, so stale mtimes are evicted by
+                # the assignment itself
+                self._parsed_by_mtime[mem_key] = (mtime, recents)
 
         if not recents and self.storage_json.exists():
-            logger.debug("getting recents from storage.json (legacy)")
-            recents = self.get_recents_legacy()
+            mtime = os.stat(self.storage_json).st_mtime
+            mem_key = ("legacy", cache_key)
+            cached = self._parsed_by_mtime.get(mem_key)
+            if cached is not None and cached[0] == mtime:
+                logger.debug("returning memory-cached recents for storage.json")
+                recents = cached[1]
+            else:
+                cached = self._sidecar_get("legacy:" + cache_key, mtime)
+                if cached is not None:
+                    logger.debug("returning sidecar-cached recents for storage.json")
+                    recents = cached
+                else:
+                    logger.debug("getting recents from storage.json (legacy)")
+                    recents = self.get_recents_legacy()
+                    self._sidecar_put("legacy:" + cache_key, mtime, recents)
+                self._parsed_by_mtime[mem_key] = (mtime, recents)
 
-        # Update the cache
-        Code._cached_recents = recents
-        Code._cache_timestamp = time.time()
+        # Update the cache; the signature was taken before parsing, so a
+        # write racing the parse misses on the next lookup instead of hiding
+        self._cached_recents = recents
+        self._cached_signature = signature
+        self._cache_timestamp = time.time()
 
         return recents
 
     def get_recents_global_state(self):
         logger.debug("connecting to global state database %s", self.global_state_db)
-        con = sqlite3.connect(self.global_state_db)
-        cur = con.cursor()
-        cur.execute(
-            'SELECT value FROM ItemTable WHERE key = "history.recentlyOpenedPathsList"'
+        # Open read-only so no write lock is ever taken against a database
+        # VS Code itself may be writing to; let the OS page cache serve the
+        # read via mmap
+        con = sqlite3.connect(
+            "file:{}?mode=ro".format(self.global_state_db), uri=True
         )
-        (json_code,) = cur.fetchone()
-        paths_list = json.loads(json_code)
+        try:
+            cur = con.cursor()
+            cur.execute("PRAGMA query_only=1")
+            cur.execute("PRAGMA mmap_size=67108864")
+            cur.execute(
+                'SELECT value FROM ItemTable WHERE key = "history.recentlyOpenedPathsList"'
+            )
+            (json_code,) = cur.fetchone()
+        finally:
+            con.close()
+        paths_list = _loads(json_code)
         entries = paths_list["entries"]
         include_types = self.include_types
         logger.debug("found %d entries in global state database", len(entries))
@@ -229,58 +665,69 @@ class Code:
         :uri https://code.visualstudio.com/updates/v1_64
         """
         logger.debug("loading storage.json")
-        storage = json.load(self.storage_json.open("r"))
+        storage = _loads(self.storage_json.read_bytes())
         entries = storage["openedPathsList"]["entries"]
         include_types = self.include_types
         logger.debug("found %d entries in storage.json", len(entries))
         return self.parse_entry_paths(entries, include_types)
 
+    # How each entry kind maps to (uri key, icon, CLI option, type)
+    _TYPE_SPEC = (
+        ("folderUri", "icon", "--folder-uri", "folder"),
+        ("fileUri", "file", "--file-uri", "file"),
+    )
+
     @staticmethod
     def parse_entry_paths(entries, include_types):
+        logger.debug("included types: %s", include_types)
+        include_types = frozenset(include_types) if include_types else frozenset()
+
         recents = []
         for path in entries:
-
-            if "folderUri" in path:
-                uri = path["folderUri"]
-                icon = "icon"
-                option = "--folder-uri"
-                entry_type = "folder"
-            elif "fileUri" in path:
-                uri = path["fileUri"]
-                icon = "file"
-                option = "--file-uri"
-                entry_type = "file"
-            elif "workspace" in path:
-                uri = path["workspace"]["configPath"]
-                icon = "workspace"
-                option = "--file-uri"
-                entry_type = "workspace"
+            for key, icon, option, entry_type in Code._TYPE_SPEC:
+                uri = path.get(key)
+                if uri is not None:
+                    break
             else:
-                logger.warning("entry not recognized: %s", path)
+                workspace = path.get("workspace")
+                if workspace is None:
+                    logger.warning("entry not recognized: %s", path)
+                    continue
+                uri = workspace["configPath"]
+                icon, option, entry_type = "workspace", "--file-uri", "workspace"
+
+            # filter the entries to only include types of the preferences["include_types"]
+            if entry_type not in include_types:
                 continue
 
-            label = path["label"] if "label" in path else uri.split("/")[-1]
+            label = path.get("label") or uri.rsplit("/", 1)[-1]
+            # The lowercased forms carry the separator command_score appends
+            label_lower = (label + " ").lower()
+            uri_lower = (uri + " ").lower()
             recents.append(
-                {
-                    "uri": uri,
-                    "label": label,
-                    "icon": icon,
-                    "option": option,
-                    "type": entry_type,
-                }
+                Recent(
+                    uri=uri,
+                    label=label,
+                    icon=icon,
+                    option=option,
+                    type=entry_type,
+                    label_lower=label_lower,
+                    uri_lower=uri_lower,
+                    mask=_char_mask(label_lower) | _char_mask(uri_lower),
+                    label_positions=_char_positions(label_lower),
+                    uri_positions=_char_positions(uri_lower),
+                    display_label=urllib.parse.unquote(label),
+                    display_uri=urllib.parse.unquote(uri),
+                )
             )
 
-        logger.debug('included types: %s' % include_types)
-        # filter the entries to only include types of the preferences["include_types"]
-
-        recents = [recent for recent in recents if recent["type"] in include_types]
         return recents
 
     def open_vscode(self, recent, excluded_env_vars):
         if not self.is_installed():
             return
-        # Get the current environment variables
-        current_env = os.environ.copy()
+        # Copy the cached environment snapshot; it doesn't change between launches
+        current_env = dict(self._base_env)
 
         # Remove the environment variables that we don't want to pass to the new process if any
         if excluded_env_vars:
@@ -289,9 +736,15 @@ class Code:
                 if env_to_exclude in current_env:
                     del current_env[env_to_exclude]
 
-        # Start the new process with the modified environment
-        subprocess.run(
-            [self.installed_path, recent["option"], recent["uri"]], env=current_env
+        # Start the new process detached, so the launcher is not blocked for
+        # as long as the VS Code window stays open
+        subprocess.Popen(
+            [self.installed_path, recent["option"], recent["uri"]],
+            env=current_env,
+            start_new_session=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
         )
 
 
@@ -310,14 +763,24 @@ class CodeExtension(Extension):
         self.subscribe(PreferencesUpdateEvent, PreferencesUpdateEventListener())
         self.code = Code()
         self.home_path = str(pathlib.Path.home())
+        # Structure-of-arrays buffers for the batch kernel, tied to the
+        # recents list object they were built from
+        self._soa_recents = None
+        self._soa = None
 
     def get_pretty_dir_path(self, path):
-        # get th epretty printed path
-        path = urllib.parse.unquote(path)
+        # get the pretty printed path; the uri is already unquoted at parse time
         path = path.replace("file://", "")
 
         return path.replace(self.home_path, "~")
 
+    def _recents_soa(self, recents):
+        # Rebuild only when get_recents returns a new list object
+        if self._soa_recents is not recents:
+            self._soa_recents = recents
+            self._soa = _build_recents_soa(recents)
+        return self._soa
+
     def get_ext_result_items(self, query):
 
         query = query.lower() if query else ""
@@ -328,35 +791,94 @@ class CodeExtension(Extension):
 
         logger.debug("prefered type: %s", prefer_type)
 
-        # Use command_score instead of fuzzywuzzy for scoring the label and URI
-        for recent in recents:
-            label_score = command_score(recent["label"], query)
-            uri_score = command_score(recent["uri"], query)
-
-
-            # prefer types
-            if prefer_type and recent["type"] == prefer_type:
-                label_score *= 1.02  # increase score by 2% for workspaces
-
+        if not query:
+            # Without a query every score degenerates to the same constant
+            # apart from the prefer_type boost, so a stable partition of the
+            # preferred entries to the front reproduces the scored ordering
+            # without running the DP
+            if prefer_type:
+                top = [r for r in recents if r.type == prefer_type]
+                top += [r for r in recents if r.type != prefer_type]
+            else:
+                top = recents
+            data = [{"recent": recent, "score": 0.99} for recent in top[:15]]
+        else:
+            # Encode the query once per keystroke; reused across all recents
+            prepared_query = _prepare_abbreviation(query) if _score_kernel else None
+            query_mask = _char_mask(query)
+
+            # Score every candidate in one parallel kernel call when possible
+            batch_scores = None
+            if _score_batch_kernel is not None and prepared_query is not None:
+                soa = self._recents_soa(recents)
+                if soa is not None:
+                    batch_scores = _score_batch_kernel(
+                        soa[0], soa[1], soa[2], soa[3], soa[4], *prepared_query
+                    )
 
-            # Only add items that have a score above a threshold
-            if label_score > 0.1 or uri_score > 0.1:
-                data.append({"recent": recent, "score": max(label_score, uri_score)})
+            # Use command_score instead of fuzzywuzzy for scoring the label and URI
+            for position, recent in enumerate(recents):
+                if batch_scores is not None:
+                    label_score = batch_scores[2 * position]
+                    uri_score = batch_scores[2 * position + 1]
+                else:
+                    # Cheap pre-filter: a candidate that does not even contain
+                    # the query as a subsequence cannot score a full match, so
+                    # skip the DP entirely. The bitset rejects most candidates
+                    # without a scan.
+                    if query_mask & recent.mask != query_mask:
+                        continue
+                    if not _is_subsequence(
+                        query, recent.label_positions
+                    ) and not _is_subsequence(query, recent.uri_positions):
+                        continue
+
+                    label_score = command_score(
+                        recent.label,
+                        query,
+                        prepared_abbreviation=prepared_query,
+                        lower_string=recent.label_lower,
+                    )
+                    # A label match this strong already ranks the entry; the
+                    # URI score could only matter as a lower alternative
+                    if label_score > 0.9:
+                        uri_score = 0.0
+                    else:
+                        uri_score = command_score(
+                            recent.uri,
+                            query,
+                            prepared_abbreviation=prepared_query,
+                            lower_string=recent.uri_lower,
+                        )
+
+                # prefer types
+                if prefer_type and recent.type == prefer_type:
+                    label_score *= 1.02  # increase score by 2% for workspaces
+
+                # Only add items that have a score above a threshold
+                if label_score > 0.1 or uri_score > 0.1:
+                    data.append(
+                        {"recent": recent, "score": max(label_score, uri_score)}
+                    )
 
-        # Sort the results by the score, highest first
-        data = sorted(data, key=lambda x: x["score"], reverse=True)
+            # Keep only the 15 best-scoring results; no need to sort the rest
+            data = heapq.nlargest(15, data, key=lambda x: x["score"])
 
-        for recent_item in data[:15]:
+        for recent_item in data:
             recent = recent_item["recent"]
 
-            # get th epretty printed path
-            path = self.get_pretty_dir_path(recent["uri"])
+            # get the pretty printed path
+            path = self.get_pretty_dir_path(recent.display_uri)
             items.append(
                 ExtensionResultItem(
-                    icon=Utils.get_path(f"images/{recent['icon']}.svg"),
-                    name=urllib.parse.unquote(recent["label"]),
+                    icon=Utils.get_path(f"images/{recent.icon}.svg"),
+                    name=recent.display_label,
                     description=path,
-                    on_enter=ExtensionCustomAction(recent),
+                    # The action payload must stay plainly serializable, so
+                    # pass just what open_vscode needs
+                    on_enter=ExtensionCustomAction(
+                        {"option": recent.option, "uri": recent.uri}
+                    ),
                 )
             )
 
@@ -406,6 +928,8 @@ class PreferencesUpdateEventListener(EventListener):
             extension.excluded_env_vars = event.new_value
         if event.id == "include_types":
             extension.code.include_types = event.new_value.split(",")
+            # The cached list was filtered under the old include_types
+            extension.code.invalidate_recents_cache()
         if event.id == "prefer_type":
             extension.prefer_type = event.new_value
 